@@ -0,0 +1,32 @@
+""" Rank aggregation algorithms and iterative improvements.
+    Author: Sibel Adali
+
+    The algorithms are in rank_aggregators, the command line runner in
+    cli. The main entry points below can also be used directly
+    from the package, for example rank_aggregation.aggregate(objects).
+    They are imported on first use, so importing the package is cheap.
+
+"""
+
+__all__ = [
+    'read_rankers',
+    'aggregate',
+    'kendall_tau',
+    'kendall_tau_estimate',
+    'indegree_aggregator',
+    'pagerank_aggregator',
+    'best_random_aggregator',
+    'blocked_aggregator',
+    'iterative_greedy_flip',
+    'iterative_best_flip',
+    'remove_top_k',
+    'ranker_analytics',
+    'pair_table',
+    'weighted_counts',
+]
+
+def __getattr__(name):
+    if name in __all__:
+        from . import rank_aggregators
+        return getattr(rank_aggregators, name)
+    raise AttributeError("module %r has no attribute %r" %(__name__, name))
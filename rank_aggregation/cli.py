@@ -0,0 +1,162 @@
+""" This is a command line runner for rank aggregation. 
+    Author: Sibel Adali
+
+    To learn about how to run, simply type:
+
+    python aggregate.py
+
+    When installed as a package, the same runner is available as the
+    rank-aggregate command.
+
+"""
+
+import sys
+from . import rank_aggregators as r
+import time
+
+def print_menu():
+        print("Usage: python aggregate.py inputfile aggregator <list of iterative algorithms>")
+        print("Aggregator list:")
+        print("\tin: indegree")
+        print("\tpg alpha: pagerank with given alpha (float between 0-1, default 0.85)")
+        print("\trnd k: random with k tries")
+        print("\tblk k: indegree over blocks of k objects (integer, default 500), for large inputs")
+        print()
+        print("Iterative algorithms (executed in the order given)")
+        print("\tigf: iterative greedy flip")
+        print("\tibf k: iterative best flip (at most k (integer, default 1) rounds")
+        print("\tir k: iterative remove up to k (integer, default 1) rankers")
+        print("\tir k screen samples: same, only trying the screen (integer, 0 for all) rankers")
+        print("\t\tthat agree least with the aggregate, and screening candidates with")
+        print("\t\tsamples (integer, optional) sampled pairs of objects")
+        print()
+        print("Example: python aggregate.py pg 0.85 ibf")
+        print("\tPagerank, followed by ibf")
+        print("Example: python aggregate.py in ir 5 ibf")
+        print("\tIndegree followed by iterative remove, followed by ibf")
+
+def print_error(msg):
+    print()
+    print("*" * (len(msg)+10))
+    print("ERROR >>>", msg)
+    print("*" * (len(msg)+10))
+    print()
+    print_menu()
+    print()
+    sys.exit()
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+    start = time.time()
+    if len(argv) <3:
+        print_menu()
+        sys.exit()
+
+    fname = argv[1]
+    try:
+        (objects,ranker_names) = r.read_rankers(fname)
+    except:
+        print_error("Incorrect file provided, cannot read rankers")
+
+    agg = argv[2]
+    arguments = argv[3:]
+    
+    lastloc = 0
+    if agg == 'pg':
+        alpha = 0.85
+        if len(arguments)>0:
+            try:
+                alpha = float(arguments[0])
+                lastloc = 1
+            except:
+                print_error("Incorrect alpha provided or alpha is omitted")
+        ranker, score = r.pagerank_aggregator(objects, 0.000001, alpha)
+        print("Pagerank algorithm, alpha =", alpha, ", score:", score)
+
+    elif agg == 'in':
+        ranker, score = r.indegree_aggregator(objects)
+        print("Indegree algorithm, score:", score)
+
+    elif agg == 'rnd':
+        k=1
+        if len(arguments)>0:
+            try:
+                k = int(arguments[0])
+                lastloc = 1
+            except:
+                print_error("An integer for the number of tries is required")
+        print("Random rank algorithm with k =", k)
+        ranker, score = r.best_random_aggregator(objects, k)
+
+    elif agg == 'blk':
+        k=500
+        if len(arguments)>0:
+            try:
+                k = int(arguments[0])
+                lastloc = 1
+            except:
+                print_error("An integer for the block size is required")
+        ranker, score = r.blocked_aggregator(objects, k)
+        print("Blocked indegree algorithm with block size", k, ", score:", score)
+    else:
+        print_error("No valid rank aggregation algorithm found")
+
+    arguments = arguments[lastloc:]
+
+    while len(arguments) > 0:
+        agg = arguments[0]
+        lastloc = 1
+        if agg == 'ibf':
+            newranker, score = r.iterative_best_flip(objects, ranker)
+            print("Iterative best flip, score:", score)
+
+        elif agg in ['igf','ir']:
+            k = 1
+            if len(arguments) > 1:
+                try:
+                    k = int(arguments[1])
+                    lastloc = 2
+                except:
+                    print_error("An integer k value is needed for algorithm" + agg)
+            if agg == 'igf':
+                newranker, score, flipped = r.iterative_greedy_flip(objects, ranker, k)
+                print("Iterative greedy flip with k =", k, "score:", score)
+            else:
+                ##optional screen and samples, as long as the values are integers
+                options = []
+                while len(options) < 2 and len(arguments) > lastloc and arguments[lastloc].isdigit():
+                    options.append(int(arguments[lastloc]))
+                    lastloc += 1
+                screen, samples = None, None
+                if len(options) > 0 and options[0] > 0:
+                    screen = options[0]
+                if len(options) > 1 and options[1] > 0:
+                    samples = options[1]
+                ids = list(range(len(ranker_names))) ##names may repeat, track columns
+                newranker, score,  removed, newobjects = r.remove_top_k(objects, ids, ranker, k,
+                                                                        samples, screen)
+                print("Iterative best removal with k =", k, "score:", score)
+                objects = newobjects
+                line = ""
+                for i in removed:
+                    line += ranker_names[i] + ", "
+                ranker_names = [ranker_names[i] for i in ids if i not in removed]
+                print("Removed rankers (in order):", line.strip().strip(","))
+            ranker = newranker
+        else:
+            print_error("Unknown algorithm"+agg)
+
+        arguments = arguments[lastloc:]
+
+    print("Final score:", score)
+    print("Final ranker:")
+    r.print_single_ranker(ranker)
+
+    end = time.time()
+    print()
+    print("Took %.2f seconds" % (end-start))
+    print()
+
+if __name__ == "__main__":
+    main()
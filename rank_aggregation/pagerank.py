@@ -41,7 +41,7 @@ def pagerank(links, jump_prob={}, threshold=0.00001, alpha=0.85):
         iter += 1
         new_scores = compute_scores(scores, links, jump_prob, alpha)
         diff = compute_diff(scores,new_scores)
-        #print "Iteration %d (diff %.6f):" %(iter,diff)
+        #print("Iteration %d (diff %.6f):" %(iter,diff))
         scores = new_scores
         if (diff < threshold) or (iter>100):
             break
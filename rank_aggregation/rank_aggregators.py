@@ -0,0 +1,1372 @@
+""" Simple rank aggregation program.
+    Author: Sibel Adali
+
+    Call using::
+
+       python -m rank_aggregation.rank_aggregators filename
+
+    Input text file should be:
+    *  comma separated
+    *  contain a header row
+    *  first column is the object ids, assumed to be integers
+    *  each column is a separate ranker
+    *  if an object is not ranked by a ranker, leave that value empty.
+
+    Data structures used:
+
+    Objects is a dictionary where object names are key, and the ranks with 
+    respect to each ranker is a value (None if the ranker does not rank 
+    a given object)
+
+    Example: Two rankers, 3 objects (a,b,c)
+    {'a': [1,1,2], 'b':[2,None,1], 'c':[None,2,3]}
+
+    A ranker is a single value version of this, for example
+    {'a': 1, 'b': 2, 'c': 3}
+    Rankers are assumed to be total, i.e. have a rank for each
+    object. It is not necessary for ranks to be increasing order. Ties
+    are possible, but are disregarded in processing.
+
+    Weights, where accepted, are a list with one weight per ranker (in
+    the order of the input columns). A ranker's agreements and
+    disagreements count with its weight, so weights of all 1 are the
+    same as no weights. Counts, where accepted, are the weighted_counts
+    for the same weights: precomputed pairwise counts that make each
+    pair comparison cost the same regardless of the number of rankers.
+
+    To Do: 
+    -----------
+    1. Handle ties
+
+"""
+
+import sys
+import random
+from . import pagerank as pg
+import time
+import copy
+import math
+from typing import Optional, Sequence
+
+##################################################
+######### Input Output functions
+##################################################
+def read_rankers(fname):
+    f = open(fname)
+    header = f.readline()
+    ranker_names = header.strip().split(",")
+    ranker_names = ranker_names[1:]
+    objects = {}
+    oid = 0
+    for line in f:
+        oid += 1
+        m = line.strip().split(",")
+        objects[oid] = m[1:]
+        for i in range(len(objects[oid])):
+            if len(objects[oid][i].strip()) == 0:
+                objects[oid][i] = None
+            else:
+                objects[oid][i] = int(objects[oid][i])
+    return (objects, ranker_names)
+
+
+def print_rankers(objects, ranker_names):
+    line = "Obj:\t"
+    for name in ranker_names:
+        line += name + "\t"
+    print(line)
+    for key in objects:
+        line = "%d:\t" %key
+        for val in objects[key]:
+            if val == None:
+                line += "None\t"
+            else:
+                line += "%d\t" %val
+        print(line)
+
+def print_single_ranker(ranker):
+    ranked = []
+    for key in ranker.keys():
+        ranked.append( (ranker[key], key) )
+    ranked.sort() ## low rank is good
+    for (val, key) in ranked:
+        print(key, end=" ")
+    print()
+
+##################################################
+######### Evaluation: Kendall tau
+##################################################
+
+def kendall_tau(objects, cmp_ranker, weights=None, counts=None):
+    agree = 0
+    disagree = 0
+    obj = list(objects.keys())
+    n = len(obj)
+    multiplier = 0.5*n*(n-1)*total_weight(objects, weights)
+    for i in range(n-1):
+        for j in range(i+1,n):
+            key1 = obj[i]
+            key2 = obj[j]
+            r21 = cmp_ranker[key1]
+            r22 = cmp_ranker[key2]
+            if r21 != None and r22 != None:
+                if r21 < r22:
+                    a, d = compare_two(objects, key1, key2, weights, counts)
+                elif r22 < r21:
+                    a, d = compare_two(objects, key2, key1, weights, counts)
+                else: ##a tie in cmp_ranker disagrees with every ranker
+                    a, d = compare_two(objects, key1, key2, weights, counts)
+                    a, d = 0, a+d
+                agree += a
+                disagree += d
+
+    return float(agree - disagree)/multiplier
+
+
+def compare_two(objects, key1, key2, weights=None, counts=None):
+    """Compares only a specific pair of objects for all the rankers.
+    It is assumed that key1 is lower ranked than key2 in comparison.
+    Hence, a flip is ordering key2 above key1.
+
+    """
+
+    if counts is not None:
+        return counts[key2].get(key1, 0), counts[key1].get(key2, 0)
+
+    ranks1 = objects[key1]
+    ranks2 = objects[key2]
+    agree = 0
+    disagree = 0
+    for ranker in range(len(ranks1)):
+        r1 = ranks1[ranker]
+        r2 = ranks2[ranker]
+        if r1 != None and r2 != None:
+            if weights is None:
+                w = 1
+            else:
+                w = weights[ranker]
+            if r1 < r2:
+                agree += w
+            elif r2 < r1:
+                disagree += w
+    return agree, disagree
+
+def kendall_tau_partial(objects, ranker, oldscore, key1, key2, weights=None, counts=None):
+    """Computes the change in kendall tau assuming the objects
+    at key1 and key2 are being switched. It updates the old
+    score and sends the new score
+
+    """
+
+    if ranker[key1] > ranker[key2]: ##switch so that key1 is the smaller rank
+        tmp = key1
+        key1 = key2
+        key2 = tmp
+
+
+    a1,d1,a2,d2 = 0,0,0,0
+    for obj in set(ranker.keys())-set([key1,key2]):
+        if ranker[obj] > ranker[key1] and \
+           ranker[obj] < ranker[key2]:
+            a,d = compare_two(objects, key1, obj, weights, counts)
+            a1 += a
+            d1 += d
+            a,d = compare_two(objects, obj, key2, weights, counts)
+            a2 += a
+            d2 += d
+    a3,d3 = compare_two(objects, key1, key2, weights, counts)
+
+    n = len(objects.keys())
+    multiplier = (0.5*n*(n-1)*total_weight(objects, weights))
+    newscore = (oldscore*multiplier + 2*(d1+d2+d3) - 2*(a1+a2+a3))/multiplier
+    return newscore
+
+def coverage_strata(objects, strata=4, weights=None):
+    """Splits the objects into the given number of groups of about equal
+    size, ordered by the number of rankers that rank each object (rankers
+    with zero weight are not counted). Used for stratified sampling of
+    object pairs in kendall_tau_estimate.
+
+    """
+
+    ocov = []
+    for key in objects:
+        cov = 0
+        vals = objects[key]
+        for i in range(len(vals)):
+            if vals[i] != None and (weights is None or weights[i] != 0):
+                cov += 1
+        ocov.append( (cov, key) )
+    ocov.sort(key=lambda x: x[0])
+
+    n = len(ocov)
+    strata = max(1, min(strata, n//2)) ##at least two objects per group
+    groups = []
+    for g in range(strata):
+        groups.append( [key for (cov, key) in ocov[g*n//strata:(g+1)*n//strata]] )
+    return groups
+
+def sample_pairs(objects, samples, groups=None):
+    """Chooses about the given number of object pairs at random, stratified
+    by the ranker coverage of the two objects (see coverage_strata): each
+    pair of groups is sampled in proportion to its number of pairs, and at
+    least twice. Returns a list of (weight, pairs) for each pair of groups,
+    where weight is the fraction of all object pairs in it.
+
+    Pairs of rarely ranked objects contribute little to kendall tau, so
+    this gives tighter intervals than uniform sampling. Scoring several
+    rankers on the same sample (see pair_scores) makes their comparison
+    paired, so their differences are much less noisy than their scores.
+
+    """
+
+    if groups is None:
+        groups = coverage_strata(objects)
+    n = 0
+    for group in groups:
+        n += len(group)
+    total_pairs = 0.5*n*(n-1)
+
+    strata = []
+    for g in range(len(groups)):
+        for h in range(g, len(groups)):
+            if g == h:
+                size = 0.5*len(groups[g])*(len(groups[g])-1)
+            else:
+                size = len(groups[g])*len(groups[h])
+            weight = size/total_pairs
+            pairs = []
+            for i in range(max(2, int(round(samples*weight)))):
+                if g == h:
+                    pairs.append( tuple(random.sample(groups[g], 2)) )
+                else:
+                    pairs.append( (random.choice(groups[g]), random.choice(groups[h])) )
+            strata.append( (weight, pairs) )
+    return strata
+
+def pair_scores(objects, cmp_ranker, strata, weights=None, counts=None):
+    """Scores each pair of a sample_pairs sample against cmp_ranker, on the
+    scale of kendall_tau: the total weight of the rankers that agree with
+    cmp_ranker minus those that disagree, over the total weight. As in
+    kendall_tau, a tie in cmp_ranker disagrees with every ranker.
+
+    """
+
+    num_rankers = total_weight(objects, weights)
+    values = []
+    for (weight, pairs) in strata:
+        stratum = []
+        for (key1, key2) in pairs:
+            r1 = cmp_ranker[key1]
+            r2 = cmp_ranker[key2]
+            if r1 == None or r2 == None:
+                a, d = 0, 0
+            elif r1 < r2:
+                a, d = compare_two(objects, key1, key2, weights, counts)
+            elif r2 < r1:
+                a, d = compare_two(objects, key2, key1, weights, counts)
+            else: ##a tie in cmp_ranker disagrees with every ranker
+                a, d = compare_two(objects, key1, key2, weights, counts)
+                a, d = 0, a+d
+            stratum.append( float(a - d)/num_rankers )
+        values.append(stratum)
+    return values
+
+def removal_pair_scores(objects, rankers, strata, weights=None):
+    """Scores a ranker for each candidate removal on a sample_pairs sample.
+    rankers is a dictionary from ranker id to the ranker to score when
+    that ranker is removed (given zero weight). Returns a dictionary from
+    ranker id to the pair_scores values of its ranker, with that ranker
+    removed. The rankers are compared once per pair for all candidates,
+    so this costs about as much as a single pair_scores without counts.
+
+    """
+
+    num_rankers = len(next(iter(objects.values())))
+    if weights is None:
+        weights = [1]*num_rankers
+    total = float(sum(weights))
+    scores = {}
+    for i in rankers:
+        scores[i] = []
+    for (weight, pairs) in strata:
+        for i in rankers:
+            scores[i].append([])
+        for (key1, key2) in pairs:
+            ranks1, ranks2 = objects[key1], objects[key2]
+            order = [0]*num_rankers ##1 if ranker puts key1 above key2, -1 if below
+            net = 0 ##weight of rankers putting key1 above minus below
+            ordered = 0 ##weight of rankers ordering the pair
+            for r in range(num_rankers):
+                x1, x2 = ranks1[r], ranks2[r]
+                if x1 != None and x2 != None and x1 != x2:
+                    if x1 < x2:
+                        order[r] = 1
+                    else:
+                        order[r] = -1
+                    net += weights[r]*order[r]
+                    ordered += weights[r]
+            for i in rankers:
+                rest = total - weights[i]
+                r1 = rankers[i][key1]
+                r2 = rankers[i][key2]
+                if rest <= 0 or r1 == None or r2 == None:
+                    value = 0.0
+                elif r1 < r2:
+                    value = (net - weights[i]*order[i])/rest
+                elif r2 < r1:
+                    value = -(net - weights[i]*order[i])/rest
+                else: ##a tie disagrees with every ranker
+                    value = -(ordered - weights[i]*abs(order[i]))/rest
+                scores[i][-1].append(value)
+    return scores
+
+def stratified_interval(strata, values, z=1.96):
+    """Combines the pair_scores values of a sample_pairs sample into an
+    estimate, and the lower and upper ends of its confidence interval (z
+    standard errors). Also works for differences of two pair_scores.
+
+    """
+
+    score = 0.0
+    variance = 0.0
+    for s in range(len(strata)):
+        weight = strata[s][0]
+        stratum = values[s]
+        count = len(stratum)
+        mean = sum(stratum)/count
+        squares = 0.0
+        for x in stratum:
+            squares += (x-mean)*(x-mean)
+        score += weight*mean
+        variance += weight*weight*squares/(count*(count-1))
+
+    half = z*math.sqrt(variance)
+    return score, score-half, score+half
+
+def kendall_tau_estimate(objects, cmp_ranker, samples, groups=None, z=1.96,
+                         weights=None, counts=None):
+    """Estimates kendall_tau from about the given number of object pairs
+    chosen at random (see sample_pairs), instead of all pairs. Returns the
+    estimated score and the lower and upper ends of its confidence
+    interval (1.96 standard errors by default, about 95%). Pass the
+    coverage_strata groups to reuse them over many calls.
+
+    """
+
+    strata = sample_pairs(objects, samples, groups)
+    values = pair_scores(objects, cmp_ranker, strata, weights, counts)
+    return stratified_interval(strata, values, z)
+
+def kendall_tau_sample(objects, cmp_ranker, samples, weights=None):
+    """ Estimates kendall_tau from about the given number of sampled pairs """
+    return kendall_tau_estimate(objects, cmp_ranker, samples, weights=weights)[0]
+
+##################################################
+######### Util functions 
+##################################################
+
+def get_ranker(objlist):
+    """ Convert a permutation of objects to a ranker dictionary """
+    ranker = {}
+    for i in range(len(objlist)):
+        key = objlist[i]
+        ranker[key] = i+1
+    return ranker
+
+def get_ranker_for_scores(scores):
+    """ Convert a dictionary containing scores for each object to a ranker dictionary """
+    oscores = []
+    for key in scores:
+        oscores.append( (scores[key], key) )
+    oscores.sort(reverse=True)
+    objlist = []
+    for (score, key) in oscores:
+        objlist.append(key)
+    return( get_ranker(objlist) )
+
+def num_higher(objects, key1, key2, weights=None, counts=None):
+    """ Counts the number of times key2 is higher than key1 in rankers. """
+    if counts is not None:
+        return counts[key1].get(key2, 0)
+    ranks1 = objects[key1]
+    ranks2 = objects[key2]
+    count = 0
+    for ranker in range(len(ranks1)):
+        x1 = ranks1[ranker]
+        x2 = ranks2[ranker]
+        if x1 != None and x2 != None and x1 > x2:
+            if weights is None:
+                count += 1
+            else:
+                count += weights[ranker]
+    return count
+
+def total_weight(objects, weights=None):
+    """ Total weight of the rankers, the number of rankers if there are no weights.
+    Raises ValueError if weights does not have one weight per ranker. """
+    num_rankers = len(next(iter(objects.values())))
+    if weights is None:
+        return num_rankers
+    if len(weights) != num_rankers:
+        raise ValueError("Need one weight for each of the %d rankers, got %d"
+                         %(num_rankers, len(weights)))
+    return sum(weights)
+
+def pair_table(objects):
+    """Compares each pair of objects once for each ranker, so that counts
+    for any weights can be computed without looking at the rankers again.
+    table[key1][key2] is the list of rankers that rank key2 higher than
+    key1 (the rankers num_higher counts). See weighted_counts.
+
+    """
+
+    obj = list(objects.keys())
+    table = {}
+    for key in obj:
+        table[key] = {}
+    for ranker in range(len(objects[obj[0]])):
+        ranked = []
+        for key in obj:
+            if objects[key][ranker] != None:
+                ranked.append( (objects[key][ranker], key) )
+        ranked.sort(key=lambda x: x[0]) ## low rank is good
+        for i in range(len(ranked)):
+            r2, key2 = ranked[i]
+            for j in range(i+1, len(ranked)):
+                r1, key1 = ranked[j]
+                if r1 > r2: ##ties are disregarded
+                    if key2 in table[key1]:
+                        table[key1][key2].append(ranker)
+                    else:
+                        table[key1][key2] = [ranker]
+    return table
+
+def weighted_counts(table, weights=None):
+    """Sums a pair_table for the given weights: counts[key1][key2] is the
+    total weight of the rankers that rank key2 higher than key1. This is
+    only a re-sum, so trying different weights for the same objects does
+    not require comparing the rankers again.
+
+    """
+
+    counts = {}
+    for key1 in table:
+        row = {}
+        for key2 in table[key1]:
+            rankers = table[key1][key2]
+            if weights is None:
+                row[key2] = len(rankers)
+            else:
+                row[key2] = sum([weights[r] for r in rankers])
+        counts[key1] = row
+    return counts
+
+def remove_ranker(objects, i):
+    for key in objects:
+        val = objects[key]
+        objects[key] = val[:i] + val[i+1:]
+
+
+def switch(ranker, key1, key2):
+    """ Switch the rankers given by the two keys """
+    r = ranker[key1]
+    ranker[key1] = ranker[key2]
+    ranker[key2] = r
+
+
+##################################################
+######### Rank aggregation functions
+##################################################
+
+def best_random_aggregator(objects, tries, debug=False, samples=None,
+                           weights=None, counts=None):
+    """ Try random rankers given number of tries. Print debug
+    info if debug is set to True.
+
+    If samples is given, each trial is first screened with
+    kendall_tau_estimate, and only scored exactly if its confidence
+    interval reaches the best score so far.
+
+    """
+
+    obj = list(objects.keys())
+    ##initialize
+    trial = obj[:]
+    random.shuffle(trial)
+    bestranker = get_ranker(trial)  #best so far
+    bestscore =  kendall_tau(objects, bestranker, weights, counts)
+
+    if debug:
+        print(bestranker, bestscore)
+    if samples is not None:
+        groups = coverage_strata(objects)
+
+    ## try random choices
+    for i in range(tries):
+        trial = obj[:]
+        random.shuffle(trial)
+        ranker = get_ranker(trial)
+        if samples is not None:
+            estimate, low, high = kendall_tau_estimate(objects, ranker, samples, groups,
+                                                       weights=weights, counts=counts)
+            if high <= bestscore: ##clearly worse, skip exact scoring
+                continue
+        score = kendall_tau(objects, ranker, weights, counts)
+        if score > bestscore:
+            bestscore = score
+            bestranker = ranker
+            if debug:
+                print("changed rankers", bestranker, bestscore)
+
+    return bestranker, bestscore
+
+
+def pagerank_aggregator(objects, threshold, alpha, weights=None, counts=None):
+    """ Returns the pagerank_ranker for the objects and its kendall tau score """
+    ranker = pagerank_ranker(objects, threshold, alpha, weights, counts)
+    rankscore = kendall_tau(objects, ranker, weights, counts)
+    return ranker, rankscore
+
+
+def pagerank_ranker(objects, threshold, alpha, weights=None, counts=None):
+    """Implements the pagerank aggregation for a given alpha and epsilon.
+    Alpha is for the bias towards surf probability, non-random in this case.
+    Epsilon controls the convergence threshold, a small number in practice.
+
+    The program first constructs the graph given the rankers and then calls
+    pagerank function repeatedly until the average change in pagerank scores 
+    is below epsion. Then, it converts the resulting scores into a ranking.
+
+    """
+
+    ### Construct graph version of the rankers and update indegrees
+    indegrees = {}
+    total_indegrees = 0.0
+    graph = {}
+    for key in objects.keys():
+        graph[key] = []
+        indegrees[key] = 0.0
+
+    for key1 in objects.keys():
+        for key2 in objects.keys():
+            if key1 != key2:
+                count = num_higher(objects, key1, key2, weights, counts)
+                if count > 0:
+                    graph[key1].append( (key2,float(count)) )
+                    indegrees[key2] += count
+                    total_indegrees += count
+
+
+    ##Normalize to add the outlinks to 1
+    for key1 in graph.keys():
+        total = 0
+        for (key2,val) in graph[key1]:
+            total += val
+        for i in range(len(graph[key1])):
+            (key2, val) = graph[key1][i]
+            graph[key1][i] = (key2, val/total)
+
+    ##Normalize indegrees as well
+    for key in indegrees.keys():
+        indegrees[key] /= total_indegrees
+
+
+    ### Call page rank
+    final_scores = pg.pagerank(graph, indegrees, threshold, alpha)
+
+    #final_scores = pg.pagerank(graph, {}, threshold, alpha)
+
+    ### Convert the final scores to a ranking
+    return get_ranker_for_scores(final_scores)
+
+
+def indegree_aggregator(objects, weights=None, counts=None):
+    """Returns a simple indegree aggregation based on the number of rankers that rank the
+    given object higher than the rest.
+    """
+
+    ranker = indegree_ranker(objects, weights, counts)
+    rankscore = kendall_tau(objects, ranker, weights, counts)
+    return ranker, rankscore
+
+
+def indegree_ranker(objects, weights=None, counts=None):
+    """ Returns the indegree_aggregator ranker, without computing its score """
+
+    ### Construct graph version of the rankers and update indegrees
+    indegrees = {}
+
+    for key in objects.keys():
+        indegrees[key] = 0.0
+
+    for key1 in objects.keys():
+        for key2 in objects.keys():
+            if key1 != key2:
+                count = num_higher(objects, key1, key2, weights, counts)
+                if count > 0:
+                    indegrees[key2] += count
+
+    ### Convert the indegree scores to a ranking
+    return get_ranker_for_scores(indegrees)
+
+##################################################
+######### Iterative flip algorithms
+##################################################
+
+def iterative_greedy_flip(objects, inputranker, k=1, weights=None, counts=None):
+    """ Flip a pair of objects in ranker until k total passes are 
+    done or no improvements are possible.
+
+    """
+
+    allkeys = list(objects.keys())
+
+    pairs = []
+    for i in range(len(allkeys)-1):
+        for j in range(i+1,len(allkeys)):
+            pairs.append( (allkeys[i], allkeys[j]) )
+    
+    ranker = copy.deepcopy(inputranker) ##copy we will work with
+    currentscore = kendall_tau(objects, ranker, weights, counts)
+    total_flips = 0
+    iter = 0
+    while (iter < k):
+        iter += 1
+        flip_done = False
+        random.shuffle(pairs)
+        ##One pass, try all pairs in pairs and check if flipping
+        ##the given pair of objects improves the error in ranker
+        for i in range(len(pairs)):
+            key1, key2 = pairs[i]
+            ##switch key1 and key2
+            newscore = kendall_tau_partial(objects, ranker, currentscore, key1, key2,
+                                           weights, counts)
+            switch(ranker, key1, key2)
+            if newscore > currentscore:
+                flip_done = True
+                total_flips += 1
+                currentscore = newscore
+            else: ## reverse the switch
+                switch(ranker, key1, key2)
+        if not flip_done:
+            break
+    return ranker, currentscore, total_flips
+
+
+def iterative_adjacent_flip(objects, inputranker, k=None, weights=None, counts=None):
+    """ Flip objects that are next to each other in ranker, whenever
+    that improves the score, until k passes over the ranker are done
+    (or until no improvements are possible if k is None).
+
+    Flipping neighbours only changes the order of that one pair, so each
+    try costs a single compare_two instead of the kendall_tau_partial scan
+    of iterative_greedy_flip, and a pass is linear in the number of
+    objects. Returns the ranker, its score and the number of flips.
+
+    """
+
+    objlist = sorted(inputranker, key=inputranker.get)
+    currentscore = kendall_tau(objects, get_ranker(objlist), weights, counts)
+    gain, total_flips = adjacent_flips(objects, objlist, k, weights, counts)
+    return get_ranker(objlist), currentscore + gain, total_flips
+
+
+def adjacent_flips(objects, objlist, k=None, weights=None, counts=None):
+    """ The passes of iterative_adjacent_flip over the list objlist (best
+    first), which is reordered in place. Returns the change in kendall tau
+    and the number of flips, so no score of the whole ranker is needed.
+
+    """
+
+    n = len(objlist)
+    multiplier = 0.5*n*(n-1)*total_weight(objects, weights)
+    gain = 0.0
+    total_flips = 0
+    iter = 0
+    while k is None or iter < k:
+        iter += 1
+        flip_done = False
+        for i in range(n-1):
+            key1, key2 = objlist[i], objlist[i+1]
+            a, d = compare_two(objects, key1, key2, weights, counts)
+            if d > a: ##more rankers put key2 above key1
+                objlist[i], objlist[i+1] = key2, key1
+                gain += 2.0*(d-a)/multiplier
+                flip_done = True
+                total_flips += 1
+        if not flip_done:
+            break
+    return gain, total_flips
+
+
+def iterative_best_flip(objects, inputranker, weights=None, counts=None):
+    """Flip a pair of objects in ranker regardless of whether it improves, then perform 
+    all other possible flips if they improve performance and record the output.
+
+    Continue for all possible pairs, and return the best performance
+    over all such configurations.
+
+    """
+
+    allkeys = list(objects.keys())
+
+    pairs = []
+    for i in range(len(allkeys)-1):
+        for j in range(i+1,len(allkeys)):
+            pairs.append( (allkeys[i], allkeys[j]) )
+    random.shuffle(pairs)
+    
+    ranker = copy.deepcopy(inputranker) ##copy we will work with
+    currentscore = kendall_tau(objects, ranker, weights, counts)
+    total_flips = 0
+    configs = []
+    iter = 0
+    max_score = currentscore
+    max_ranker = inputranker
+
+    for i in range(len(pairs)):
+        key1,key2 = pairs[i] ##current pair being flipped
+
+        iter_ranker = copy.deepcopy(ranker)
+        iter_score = kendall_tau_partial(objects, ranker, currentscore, key1, key2,
+                                         weights, counts)
+        switch(iter_ranker, key1, key2)
+
+        ##One pass, try all pairs in pairs and check if flipping
+        ##the given pair of objects improves the error in ranker
+        for j in range(len(pairs)):
+            if i == j:
+                continue
+            key1, key2 = pairs[j]
+            ##switch key1 and key2
+            newscore = kendall_tau_partial(objects, ranker, iter_score, key1, key2,
+                                           weights, counts)
+            switch(iter_ranker, key1, key2)
+            if newscore > iter_score:
+                iter_score = newscore
+            else: ## reverse the switch
+                switch(iter_ranker, key1, key2)
+        if iter_score > max_score:
+            max_score = iter_score
+            max_ranker = iter_ranker
+            
+    return max_ranker, max_score
+
+
+##################################################
+######### Ranker analytics
+##################################################
+
+def ranker_analytics(objects, ranker, agreement=True):
+    """Computes per ranker diagnostics in a single pass over all pairs
+    of objects. Returns three values, indexed by ranker id:
+
+    * tau: the kendall tau of each ranker alone against the given ranker,
+      on the same scale as kendall_tau (so the average of tau over all
+      rankers is kendall_tau(objects, ranker), and the average weighted
+      by weights is kendall_tau(objects, ranker, weights)). As in
+      kendall_tau, a tie in the given ranker disagrees with every ranker,
+    * coverage: the fraction of objects ranked by each ranker,
+    * the ranker-ranker agreement matrix: agreement[i][j] is the kendall
+      tau between rankers i and j over the pairs both rank without a
+      tie, or None if there are no such pairs. Pairwise agreement costs
+      time quadratic in the number of rankers, set agreement to False
+      to skip it (None is returned instead).
+
+    """
+
+    obj = list(objects.keys())
+    n = len(obj)
+    num_rankers = len(objects[obj[0]])
+
+    coverage = [0.0]*num_rankers
+    for key in obj:
+        for i in range(num_rankers):
+            if objects[key][i] != None:
+                coverage[i] += 1
+    coverage = [float(c)/n for c in coverage]
+
+    tau = [0]*num_rankers
+    net = [[0]*num_rankers for i in range(num_rankers)] ##agree - disagree
+    comparable = [[0]*num_rankers for i in range(num_rankers)]
+    for a in range(n-1):
+        for b in range(a+1, n):
+            key1, key2 = obj[a], obj[b]
+            if ranker[key1] > ranker[key2]: ##key1 is higher in ranker
+                key1, key2 = key2, key1
+            tie = ranker[key1] == ranker[key2]
+            ranks1, ranks2 = objects[key1], objects[key2]
+            signs = [] ##(ranker id, 1 if it puts key1 above key2, -1 otherwise)
+            for i in range(num_rankers):
+                r1, r2 = ranks1[i], ranks2[i]
+                if r1 != None and r2 != None and r1 != r2:
+                    if r1 < r2:
+                        signs.append( (i, 1) )
+                    else:
+                        signs.append( (i, -1) )
+            for (i, si) in signs:
+                if tie: ##as in kendall_tau, a tie in ranker disagrees with every ranker
+                    tau[i] -= 1
+                else:
+                    tau[i] += si
+            if agreement:
+                for (i, si) in signs:
+                    for (j, sj) in signs:
+                        net[i][j] += si*sj
+                        comparable[i][j] += 1
+
+    multiplier = 0.5*n*(n-1)
+    tau = [t/multiplier for t in tau]
+    if not agreement:
+        return tau, coverage, None
+
+    matrix = []
+    for i in range(num_rankers):
+        row = []
+        for j in range(num_rankers):
+            if comparable[i][j] > 0:
+                row.append( float(net[i][j])/comparable[i][j] )
+            else:
+                row.append(None)
+        matrix.append(row)
+    return tau, coverage, matrix
+
+def suspicious_rankers(objects, ranker, num, weights=None):
+    """Returns the ids of the num rankers whose removal raises the
+    (weighted) average of tau over the remaining rankers the most, worst
+    first. These are the most likely to improve the score of the given
+    ranker when removed. Without weights, they are the rankers with the
+    lowest tau. Rankers with zero weight are never returned, removing
+    them changes nothing.
+
+    """
+
+    tau, coverage, matrix = ranker_analytics(objects, ranker, agreement=False)
+    if weights is None:
+        weights = [1]*len(tau)
+    total = 0.0
+    for i in range(len(tau)):
+        total += weights[i]*tau[i]
+    rest = float(sum(weights))
+
+    after = [] ## (average tau without ranker i, ranker id)
+    for i in range(len(tau)):
+        if weights[i] != 0 and rest - weights[i] > 0:
+            after.append( ((total - weights[i]*tau[i])/(rest - weights[i]), i) )
+    after.sort(key=lambda x: x[0], reverse=True)
+    return [i for (avg, i) in after[:num]]
+
+##################################################
+######### Function to call aggregators while
+######### removing rankers to manage errors
+##################################################
+
+def removal_indegree_rankers(objects, candidates, weights=None):
+    """Returns a dictionary from each candidate ranker id to the
+    indegree_ranker of the objects with that ranker removed (given zero
+    weight). The indegree of an object is the weighted sum over rankers of
+    the number of objects each ranker puts below it, so each candidate
+    only subtracts the share of one ranker, without comparing pairs.
+
+    """
+
+    obj = list(objects.keys())
+    num_rankers = len(objects[obj[0]])
+    if weights is None:
+        weights = [1]*num_rankers
+
+    below = [] ##below[r][key]: number of objects ranker r puts below key
+    indegrees = {}
+    for key in obj:
+        indegrees[key] = 0.0
+    for r in range(num_rankers):
+        ranked = []
+        for key in obj:
+            if objects[key][r] != None:
+                ranked.append( (objects[key][r], key) )
+        ranked.sort(key=lambda x: x[0], reverse=True) ## worst first
+        share = {}
+        num_below = 0 ##number of objects ranked strictly worse
+        for i in range(len(ranked)):
+            if i > 0 and ranked[i][0] != ranked[i-1][0]:
+                num_below = i
+            share[ranked[i][1]] = num_below
+            indegrees[ranked[i][1]] += weights[r]*num_below
+        below.append(share)
+
+    rankers = {}
+    for i in candidates:
+        scores = {}
+        for key in obj:
+            scores[key] = indegrees[key] - weights[i]*below[i].get(key, 0)
+        rankers[i] = get_ranker_for_scores(scores)
+    return rankers
+
+def remove_top_k(objects, ranker_names, nullranker, k, samples=None, screen=None,
+                 weights=None, table=None):
+    """ Removes up to k rankers until the error of using the
+    input aggregator improves.
+
+    If samples is given, candidate removals are first screened without
+    building their pagerank rankers: each candidate gets the indegree
+    ranker of the remaining rankers (see removal_indegree_rankers), and
+    these are estimated on one shared sample of object pairs (see
+    removal_pair_scores). Only the candidates whose paired difference to
+    the best estimate is not clearly negative are aggregated with pagerank
+    and scored exactly.
+
+    If screen is given, only the screen rankers with the lowest kendall
+    tau against the current aggregate (see suspicious_rankers) are tried
+    for removal in each iteration.
+
+    Removing a ranker is scored as giving it zero weight, and removed
+    rankers keep zero weight until the end, so the rankers are compared
+    only once (see pair_table) and each candidate only re-sums the counts.
+    table is the pair_table of objects, it is built if not given. Rankers
+    with zero weight in weights are never tried.
+
+    Returns the final ranker and score, the ranker_names of the removed
+    rankers and the objects without the removed rankers. ranker_names can
+    be any labels with one per column, for example range(num_rankers) to
+    find out which columns (and weights) remain when names are not unique.
+
+    """
+
+    if screen is not None and screen < 1:
+        raise ValueError("screen must be at least 1, got %r" %(screen,))
+    num_rankers = total_weight(objects) ##number of columns
+    if weights is None:
+        weights = [1]*num_rankers
+    total_weight(objects, weights)
+    if len(ranker_names) != num_rankers:
+        raise ValueError("Need one name for each of the %d rankers" %num_rankers)
+    if table is None:
+        table = pair_table(objects)
+    localweights = weights[:] ##removed rankers get zero weight
+    nullscore = kendall_tau(objects, nullranker, localweights,
+                            weighted_counts(table, localweights)) ##initial score
+
+    iter = 0
+    removed = [] ##ranker ids, in the order removed
+
+    while (iter<k): ##iterate at most k times, but break if no improvement
+        iter += 1
+        
+        #######################################################################
+        ###Find the best ranker to remove in this iteration
+        #######################################################################
+
+        performance = [] ## (score improvement, ranker id) from removing ranker id
+        if screen is None:
+            to_try = [i for i in range(num_rankers) if localweights[i] != 0]
+        else:
+            to_try = suspicious_rankers(objects, nullranker, screen, localweights)
+        if samples is not None and len(to_try) > 1:
+            ##keep the candidates whose indegree ranker may be best
+            groups = coverage_strata(objects, weights=localweights)
+            strata = sample_pairs(objects, samples, groups)
+            rankers = removal_indegree_rankers(objects, to_try, localweights)
+            values = removal_pair_scores(objects, rankers, strata, localweights)
+            best = max(to_try, key=lambda i: stratified_interval(strata, values[i])[0])
+            kept = []
+            for i in to_try:
+                diffs = []
+                for s in range(len(strata)):
+                    diffs.append( [x-y for (x, y) in zip(values[i][s], values[best][s])] )
+                diff, diff_low, diff_high = stratified_interval(strata, diffs)
+                if diff_high >= 0:
+                    kept.append(i)
+            to_try = kept
+        for i in to_try:
+            cur_weights = localweights[:]
+            cur_weights[i] = 0  ##remove ranker i
+            cur_counts = weighted_counts(table, cur_weights)
+
+            ##check new score and record performance improvement
+            ranker, score = pagerank_aggregator(objects, 0.000001, 0.95,
+                                                cur_weights, cur_counts)
+            performance.append( (score-nullscore, i) )
+
+        performance.sort(reverse=True)
+    
+        ##Now remove the top performing ranker if score is higher than zero
+        if len(performance) > 0 and performance[0][0] > 0:
+            to_remove = performance[0][1]
+            localweights[to_remove] = 0
+    
+            ##get the improved new score and record performance improvement
+            nullranker, nullscore = pagerank_aggregator(objects, 0.000001, 0.95, localweights,
+                                                        weighted_counts(table, localweights))
+            removed.append(to_remove)
+        else:
+            break ##no further improvements
+
+    localobjects = copy.deepcopy(objects) ##must not change the original set
+    for i in sorted(removed, reverse=True):
+        remove_ranker(localobjects, i)
+    return nullranker, nullscore, [ranker_names[i] for i in removed], localobjects
+
+##################################################
+######### Divide and conquer aggregation for
+######### large sets of objects
+##################################################
+
+def borda_scores(objects, weights=None):
+    """Returns a normalized Borda score for each object: the (weighted)
+    average over the rankers that rank the object of the fraction of
+    ranked objects it is placed above. Objects not ranked by anyone (with
+    a positive weight) get a score of zero.
+    Takes O(n log n) time per ranker, no pairs of objects are compared.
+
+    """
+
+    obj = list(objects.keys())
+    num_rankers = len(objects[obj[0]])
+    totals = {}
+    counts = {}
+    for key in obj:
+        totals[key] = 0.0
+        counts[key] = 0
+
+    for ranker in range(num_rankers):
+        if weights is None:
+            w = 1
+        else:
+            w = weights[ranker]
+        ranked = []
+        for key in obj:
+            if objects[key][ranker] != None:
+                ranked.append( (objects[key][ranker], key) )
+        ranked.sort() ## low rank is good
+        m = len(ranked)
+        above = 0 ##number of objects ranked strictly better
+        for i in range(m):
+            if i > 0 and ranked[i][0] != ranked[i-1][0]:
+                above = i
+            key = ranked[i][1]
+            totals[key] += w*(1.0 - float(above)/m)
+            counts[key] += w
+
+    scores = {}
+    for key in obj:
+        if counts[key] > 0:
+            scores[key] = totals[key]/counts[key]
+        else:
+            scores[key] = 0.0
+    return scores
+
+def partition_objects(objects, block_size, partition='borda', weights=None):
+    """Splits the objects into blocks of at most block_size objects, in
+    the order of their Borda scores (best block first).
+
+    With partition 'borda', blocks have exactly block_size objects (except
+    the last one). With partition 'quantile', the number of blocks is the
+    same, but they are cut at the Borda score quantiles, so objects with
+    the same score stay in the same block. A block that gets more than
+    block_size objects this way (for example all the objects no ranker
+    ranks, which all score zero) is split into blocks of block_size.
+
+    """
+
+    if partition not in ('borda', 'quantile'):
+        raise ValueError("Unknown partition: %r" %(partition,))
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1, got %r" %(block_size,))
+
+    scores = borda_scores(objects, weights)
+    oscores = []
+    for key in scores:
+        oscores.append( (scores[key], key) )
+    oscores.sort(key=lambda x: x[0], reverse=True)
+    n = len(oscores)
+
+    if partition == 'borda':
+        groups = [oscores[i:i+block_size] for i in range(0, n, block_size)]
+    else:
+        num_blocks = (n + block_size - 1)//block_size
+        cuts = [oscores[j*n//num_blocks][0] for j in range(1, num_blocks)]
+        groups = [[] for j in range(num_blocks)]
+        j = 0 ##block of the current object
+        for (score, key) in oscores:
+            while j < len(cuts) and score <= cuts[j]: ##past the next quantile
+                j += 1
+            groups[j].append( (score, key) )
+
+    blocks = []
+    for group in groups:
+        for i in range(0, len(group), block_size):
+            blocks.append( [key for (score, key) in group[i:i+block_size]] )
+    return blocks
+
+def sub_objects(objects, keys):
+    """ Restrict the objects dictionary to the given keys """
+    sub = {}
+    for key in keys:
+        sub[key] = objects[key]
+    return sub
+
+def _aggregate_block(args):
+    """Aggregates a single block and improves it with k passes of adjacent
+    flip. Returns the block as a list of keys, best first. Defined at the
+    top level so that it can be sent to worker processes.
+
+    A block that no ranker orders any pair of (for example objects that
+    no ranker ranks) keeps its order, the Borda order of the partition.
+    Blocks are not scored, only the merged ranking is.
+
+    """
+
+    objects, method, k, alpha, threshold, weights = args
+    if method not in ('pg', 'in'):
+        raise ValueError("Unknown block aggregation method: %r" %(method,))
+    if len(objects) < 2:
+        return list(objects.keys())
+    counts = weighted_counts(pair_table(objects), weights)
+    ordered = False
+    for key in counts:
+        for val in counts[key].values():
+            if val > 0:
+                ordered = True
+    if not ordered:
+        return list(objects.keys())
+
+    if method == 'pg':
+        ranker = pagerank_ranker(objects, threshold, alpha, weights, counts)
+    else:
+        ranker = indegree_ranker(objects, weights, counts)
+    objlist = sorted(ranker, key=ranker.get)
+    if k is None or k > 0:
+        adjacent_flips(objects, objlist, k, weights, counts)
+    return objlist
+
+def refine_window(objects, objlist, lo, hi, k=None, weights=None):
+    """Runs adjacent flip on the objects at positions lo to hi-1 of the
+    list objlist, and puts them back in the improved order. A flip inside
+    the window does not change the order of any pair with an object
+    outside the window, so the improvement carries over to the full
+    ranking exactly.
+
+    """
+
+    window = objlist[lo:hi]
+    if len(window) < 2:
+        return
+    adjacent_flips(sub_objects(objects, window), window, k, weights)
+    objlist[lo:hi] = window
+
+def blocked_aggregator(objects, block_size=500, method='in', k=None, window=50,
+                       processes=1, partition='borda', alpha=0.85,
+                       threshold=0.000001, exact_limit=2000, samples=100000,
+                       weights=None):
+    """Divide and conquer aggregation for large sets of objects, where the
+    all pairs graph of the simple aggregators is too expensive.
+
+    1. Objects are ordered by their Borda scores and split into blocks
+       (see partition_objects).
+    2. Each block is aggregated with the given method ('in' or 'pg') and
+       improved with k passes of adjacent flip (until no flip improves if
+       k is None, none if k is 0). Blocks are handled in parallel if
+       processes is larger than 1.
+    3. Blocks are concatenated and the window objects around each block
+       boundary are improved with adjacent flip.
+
+    For n objects, m rankers and blocks of b objects, step 2 compares
+    about n*b*m/2 pairs of ranks (the all pairs counts of each block) and
+    each adjacent flip pass only n more, so the cost grows linearly with
+    n for a fixed block size. The exact score alone costs n*n*m/2, hence
+    the sampled score above exact_limit objects.
+
+    The returned score is the exact kendall_tau if there are at most
+    exact_limit objects, otherwise it is estimated from the given number
+    of sampled pairs with kendall_tau_sample.
+
+    """
+
+    blocks = partition_objects(objects, block_size, partition, weights)
+    tasks = []
+    for block in blocks:
+        tasks.append( (sub_objects(objects, block), method, k, alpha, threshold, weights) )
+
+    if processes > 1 and len(tasks) > 1:
+        import multiprocessing
+        pool = multiprocessing.Pool(processes)
+        try:
+            ordered = pool.map(_aggregate_block, tasks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        ordered = list(map(_aggregate_block, tasks))
+
+    ##Merge the blocks and refine around the boundaries
+    objlist = []
+    boundaries = []
+    for block in ordered:
+        if len(objlist) > 0:
+            boundaries.append(len(objlist))
+        objlist += block
+    half = window//2
+    for b in boundaries:
+        refine_window(objects, objlist, max(0, b-half), min(len(objlist), b+half), k, weights)
+
+    ranker = get_ranker(objlist)
+    if len(objlist) <= exact_limit:
+        rankscore = kendall_tau(objects, ranker, weights)
+    else:
+        rankscore = kendall_tau_sample(objects, ranker, samples, weights)
+    return ranker, rankscore
+
+##################################################
+######### Library interface
+##################################################
+
+AGGREGATORS = ('in', 'pg', 'rnd', 'blk')
+IMPROVERS = ('igf', 'ibf', 'ir')
+
+def aggregate(rank_table: dict, method: str = 'pg', improvers: Sequence = (),
+              alpha: float = 0.85, tries: int = 1, threshold: float = 0.000001,
+              ranker_names: Optional[list] = None, block_size: int = 500,
+              processes: int = 1, samples: Optional[int] = None,
+              screen: Optional[int] = None, weights: Optional[list] = None,
+              table: Optional[dict] = None) -> tuple[dict, float, list]:
+    """Runs a simple aggregator on the given rankers, followed by any number
+    of iterative improvements, in the order given. This is the library
+    version of the command line wrapper in cli.py.
+
+    rank_table is an objects dictionary as returned by read_rankers.
+    method is one of AGGREGATORS: 'in' (indegree), 'pg' (pagerank with the
+    given alpha), 'rnd' (best of the given number of random tries) or 'blk'
+    (indegree over blocks of block_size objects, see blocked_aggregator,
+    using the given number of processes).
+
+    improvers is a list of IMPROVERS names ('igf', 'ibf', 'ir'), or of
+    (name, k) pairs to give the number of passes for igf or the maximum
+    number of rankers to remove for ir.
+
+    If samples is given, rnd and ir screen their candidates with sampled
+    Kendall-tau estimates before scoring them exactly. If screen is given,
+    ir only tries to remove that many of the rankers that agree least
+    with the current aggregate.
+
+    weights gives one weight per ranker (ValueError if the number of
+    weights is not the number of rankers). table is a pair_table of
+    rank_table: when given, all steps use weighted_counts of it instead
+    of comparing the rankers for each pair, so trying many weights for
+    the same rank_table only builds the table once. This includes every
+    iteration of ir, which gives removed rankers zero weight instead of
+    dropping their columns. Only blk compares the rankers again, within
+    each block.
+
+    Returns the final ranker, its Kendall-tau score and the ranker_names
+    of the rankers removed by ir, in order (ranker1, ranker2, ... for the
+    columns if no ranker_names are given). The input rank_table is not
+    changed, even if rankers are removed.
+
+    """
+
+    if method not in AGGREGATORS:
+        raise ValueError("Unknown aggregation method: %r" %(method,))
+    steps = []
+    for improver in improvers:
+        if isinstance(improver, str):
+            name, k = improver, 1
+        else:
+            name, k = improver
+        if name not in IMPROVERS:
+            raise ValueError("Unknown iterative algorithm: %r" %(name,))
+        steps.append( (name, k) )
+
+    total_weight(rank_table, weights) ##check there is one weight per ranker
+    counts = None
+    if table is not None:
+        counts = weighted_counts(table, weights)
+
+    if method == 'pg':
+        ranker, score = pagerank_aggregator(rank_table, threshold, alpha, weights, counts)
+    elif method == 'in':
+        ranker, score = indegree_aggregator(rank_table, weights, counts)
+    elif method == 'rnd':
+        ranker, score = best_random_aggregator(rank_table, tries, samples=samples,
+                                               weights=weights, counts=counts)
+    else:
+        ranker, score = blocked_aggregator(rank_table, block_size, processes=processes,
+                                           weights=weights)
+
+    if ranker_names is None:
+        num_rankers = len(next(iter(rank_table.values())))
+        ranker_names = ["ranker%d" %(i+1) for i in range(num_rankers)]
+    removed_names = []
+
+    for (name, k) in steps:
+        if name == 'igf':
+            ranker, score, flipped = iterative_greedy_flip(rank_table, ranker, k, weights, counts)
+        elif name == 'ibf':
+            ranker, score = iterative_best_flip(rank_table, ranker, weights, counts)
+        else:
+            ids = list(range(len(ranker_names))) ##names may repeat, track columns
+            ranker, score, removed, newobjects = remove_top_k(rank_table, ids, ranker, k, samples,
+                                                              screen, weights, table)
+            if len(removed) > 0: ##keep all columns, removed rankers get zero weight
+                if weights is None:
+                    weights = [1]*len(ids)
+                weights = weights[:]
+                for i in removed:
+                    weights[i] = 0
+                if counts is not None:
+                    counts = weighted_counts(table, weights)
+            removed_names += [ranker_names[i] for i in removed]
+
+    return ranker, score, removed_names
+
+##################################################
+######### Main body of the code
+##################################################
+
+if __name__ == "__main__":
+    debug = False
+    if len(sys.argv)<2:
+        print("Usage python -m rank_aggregation.rank_aggregators filename")
+    else:
+
+        start = time.time()
+        fname = sys.argv[1]
+        (objects,ranker_names) = read_rankers(fname)
+        #print_rankers(objects, ranker_names)
+
+        ranker, score = indegree_aggregator(objects)
+        print("Indegree", score)
+        print_single_ranker(ranker)
+
+        ranker, score = pagerank_aggregator(objects, 0.000001, 0.85)
+        print("Pagerank:", score)
+        print_single_ranker(ranker)
+     
+        ### You can also try random aggregation, but not advisable for large data
+        ### Unless you run many trials, this will not work well
+        #ranker, score = best_random_aggregator(objects, 10, debug)
+        #print "Best random:", score
+        #print_single_ranker(ranker)
+
+        ranker2, score, total_flips = iterative_greedy_flip(objects, ranker, 5)
+        print("Iterative greedy flip k=5 using pagerank:", score)
+        print_single_ranker(ranker2)
+        print("Total number of flips", total_flips)
+
+        ranker1, score, removed, newobjects = remove_top_k(objects, ranker_names, ranker, 5)
+        print("Iterative remove with pagerank:", score)
+        print_single_ranker(ranker1)
+        print("Removed", removed)
+
+        ranker3, score, total_flips = iterative_greedy_flip(newobjects, ranker1, 5)
+        print("Iterative greedy flip after removal:", score)
+        print_single_ranker(ranker3)
+        print("Total number of flips", total_flips)
+
+        ranker3, score = iterative_best_flip(objects, ranker)
+        print("Iterative best flip using pagerank:", score)
+        print_single_ranker(ranker3)
+
+        end = time.time()
+        print("Took", end-start, "seconds")
+
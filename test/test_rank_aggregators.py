@@ -0,0 +1,309 @@
+""" Regression checks for the rank aggregators, run with pytest.
+    The data files are the ones used in test_runs.txt.
+
+"""
+
+import os
+import random
+
+import pytest
+
+from rank_aggregation import rank_aggregators as r
+
+DATA = os.path.dirname(os.path.abspath(__file__))
+
+def read(name):
+    return r.read_rankers(os.path.join(DATA, name))
+
+def sparse_objects(num_objects, num_rankers, num_ranked, seed=0):
+    """ Rankers that each rank num_ranked random objects out of num_objects """
+    rnd = random.Random(seed)
+    objects = {}
+    for key in range(1, num_objects+1):
+        objects[key] = [None]*num_rankers
+    for ranker in range(num_rankers):
+        keys = rnd.sample(range(1, num_objects+1), num_ranked)
+        for i in range(len(keys)):
+            objects[keys[i]][ranker] = i+1
+    return objects
+
+##################################################
+######### Blocked aggregation
+##################################################
+
+@pytest.mark.parametrize("partition", ['borda', 'quantile'])
+def test_blocked_aggregator_scores_its_ranker(partition):
+    objects, names = read("data50_150.csv")
+    ranker, score = r.blocked_aggregator(objects, block_size=12, window=10,
+                                         partition=partition)
+    assert sorted(ranker.values()) == list(range(1, len(objects)+1))
+    assert score == pytest.approx(r.kendall_tau(objects, ranker))
+
+def test_refine_window_improvement_is_exact_for_full_ranking():
+    objects, names = read("data50_150.csv")
+    objlist = list(objects.keys())
+    before = r.kendall_tau(objects, r.get_ranker(objlist))
+    window = objlist[10:30]
+    cur_obj = r.sub_objects(objects, window)
+    old = r.kendall_tau(cur_obj, r.get_ranker(window))
+    r.refine_window(objects, objlist, 10, 30)
+    new = r.kendall_tau(cur_obj, r.get_ranker(objlist[10:30]))
+    after = r.kendall_tau(objects, r.get_ranker(objlist))
+
+    n = len(objects)
+    w = len(window)
+    ##convert the window scores to the scale of the full ranking
+    gain = (new - old)*(0.5*w*(w-1))/(0.5*n*(n-1))
+    assert new >= old
+    assert after - before == pytest.approx(gain)
+
+def test_adjacent_flip_score_matches_kendall_tau():
+    objects, names = read("data20_40.csv")
+    ranker, score = r.indegree_aggregator(objects)
+    newranker, newscore, flips = r.iterative_adjacent_flip(objects, ranker)
+    assert newscore >= score
+    assert newscore == pytest.approx(r.kendall_tau(objects, newranker))
+
+def test_quantile_partition_caps_block_size():
+    objects = sparse_objects(2000, 5, 200)
+    for partition in ['borda', 'quantile']:
+        blocks = r.partition_objects(objects, 250, partition)
+        assert max([len(b) for b in blocks]) <= 250
+        assert sorted(sum(blocks, [])) == sorted(objects)
+
+@pytest.mark.parametrize("method", ['in', 'pg'])
+@pytest.mark.parametrize("partition", ['borda', 'quantile'])
+def test_blocked_aggregator_handles_unranked_blocks(method, partition):
+    objects = sparse_objects(2000, 5, 200)
+    ranker, score = r.blocked_aggregator(objects, 250, method=method, partition=partition,
+                                         window=20)
+    assert sorted(ranker.values()) == list(range(1, len(objects)+1))
+
+def test_quantile_partition_keeps_ties_together():
+    objects, names = read("data50_150.csv")
+    scores = r.borda_scores(objects)
+    blocks = r.partition_objects(objects, 10, 'quantile')
+    for i in range(len(blocks)-1):
+        if len(blocks[i]) < 10:
+            assert min([scores[k] for k in blocks[i]]) > max([scores[k] for k in blocks[i+1]])
+
+def test_partition_rejects_bad_block_size():
+    objects, names = read("data10_10.csv")
+    with pytest.raises(ValueError):
+        r.partition_objects(objects, 0)
+
+##################################################
+######### Sampled kendall tau
+##################################################
+
+def test_estimate_interval_covers_exact_score():
+    random.seed(1)
+    objects, names = read("data50_150.csv")
+    ranker, score = r.indegree_aggregator(objects)
+    groups = r.coverage_strata(objects)
+    hits = 0
+    for i in range(100):
+        estimate, low, high = r.kendall_tau_estimate(objects, ranker, 300, groups)
+        if low <= score <= high:
+            hits += 1
+    assert hits >= 85 ##nominal 95% coverage
+
+def test_estimate_scores_ties_like_kendall_tau():
+    random.seed(2)
+    objects, names = read("data10_10.csv")
+    tied = {}
+    for key in objects:
+        tied[key] = (key+1)//2 ##pairs of objects share a rank
+    exact = r.kendall_tau(objects, tied)
+    values = []
+    for i in range(200):
+        values.append( r.kendall_tau_estimate(objects, tied, 200)[0] )
+    assert sum(values)/len(values) == pytest.approx(exact, abs=0.01)
+
+def test_sampled_removal_matches_exact_removal():
+    objects, names = read("data50_150.csv")
+    ranker, score = r.indegree_aggregator(objects)
+    exact = r.remove_top_k(objects, names, ranker, 1)
+    for seed in range(3):
+        random.seed(seed)
+        sampled = r.remove_top_k(objects, names, ranker, 1, samples=500)
+        assert sampled[2] == exact[2]
+        assert sampled[1] == pytest.approx(exact[1])
+
+def test_removal_screening_matches_weighted_rankers():
+    random.seed(4)
+    objects, names = read("data20_40.csv")
+    weights = [float(i % 3) for i in range(len(names))]
+    candidates = [0, 1, 5]
+    rankers = r.removal_indegree_rankers(objects, candidates, weights)
+    rankers[1] = {}
+    for key in objects:
+        rankers[1][key] = (key+1)//2 ##with ties
+    strata = r.sample_pairs(objects, 300)
+    values = r.removal_pair_scores(objects, rankers, strata, weights)
+    for i in candidates:
+        cur_weights = weights[:]
+        cur_weights[i] = 0
+        if i != 1:
+            assert rankers[i] == r.indegree_ranker(objects, cur_weights)
+        expected = r.pair_scores(objects, rankers[i], strata, cur_weights)
+        for s in range(len(strata)):
+            assert values[i][s] == pytest.approx(expected[s])
+
+##################################################
+######### Ranker analytics
+##################################################
+
+def test_analytics_tau_averages_to_kendall_tau():
+    objects, names = read("data20_40.csv")
+    ranker, score = r.indegree_aggregator(objects)
+    tau, coverage, agreement = r.ranker_analytics(objects, ranker)
+    assert sum(tau)/len(tau) == pytest.approx(score)
+    for i in range(len(names)):
+        assert agreement[i][i] == pytest.approx(1.0)
+        for j in range(len(names)):
+            assert agreement[i][j] == agreement[j][i]
+
+    tied = {}
+    for key in objects:
+        tied[key] = (ranker[key]+1)//2 ##pairs of objects share a rank
+    tau, coverage, tiedagreement = r.ranker_analytics(objects, tied)
+    assert sum(tau)/len(tau) == pytest.approx(r.kendall_tau(objects, tied))
+    assert tiedagreement == agreement ##does not depend on the ranker
+
+def test_screened_removal_rejects_empty_screen():
+    objects, names = read("data10_10.csv")
+    ranker, score = r.indegree_aggregator(objects)
+    with pytest.raises(ValueError):
+        r.remove_top_k(objects, names, ranker, 1, samples=100, screen=0)
+
+def test_screened_removal_with_samples():
+    random.seed(0)
+    objects, names = read("data20_40.csv")
+    ranker, score = r.indegree_aggregator(objects)
+    newranker, newscore, removed, newobjects = r.remove_top_k(objects, names, ranker, 3,
+                                                              samples=200, screen=5)
+    assert newscore >= score
+    assert newscore == pytest.approx(r.kendall_tau(newobjects, newranker))
+
+##################################################
+######### Weighted rankers
+##################################################
+
+def duplicated(objects, names, copies):
+    """ Objects and names with ranker i repeated copies[i] times """
+    newobjects = {}
+    for key in objects:
+        newobjects[key] = []
+        for i in range(len(names)):
+            newobjects[key] += [objects[key][i]]*copies[i]
+    newnames = []
+    for i in range(len(names)):
+        newnames += [names[i]]*copies[i]
+    return newobjects, newnames
+
+def test_weights_match_duplicated_columns():
+    objects, names = read("data20_40.csv")
+    copies = [1]*len(names)
+    copies[3], copies[7] = 2, 3
+    dupobjects, dupnames = duplicated(objects, names, copies)
+    counts = r.weighted_counts(r.pair_table(objects), copies)
+
+    ranker, score = r.indegree_aggregator(objects, copies)
+    assert (ranker, score) == r.indegree_aggregator(dupobjects)
+    assert r.indegree_aggregator(objects, copies, counts) == (ranker, score)
+
+    ranker, score = r.pagerank_aggregator(objects, 0.000001, 0.85, copies, counts)
+    dupranker, dupscore = r.pagerank_aggregator(dupobjects, 0.000001, 0.85)
+    assert ranker == dupranker
+    assert score == pytest.approx(dupscore)
+
+    random.seed(3)
+    flipped = r.iterative_greedy_flip(objects, ranker, 1, copies, counts)
+    random.seed(3)
+    dupflipped = r.iterative_greedy_flip(dupobjects, ranker, 1)
+    assert flipped[0] == dupflipped[0]
+    assert flipped[1] == pytest.approx(dupflipped[1])
+
+def test_aggregate_tracks_weights_of_duplicate_names():
+    objects, names = read("data10_10.csv")
+    copies = [1]*len(names)
+    copies[6] = 2 ##ranker7, the first ranker removed
+    dupobjects, dupnames = duplicated(objects, names, copies)
+    uniquenames = ["column%d" %i for i in range(len(dupnames))]
+    weights = [float(i % 3 + 1) for i in range(len(dupnames))]
+    improvers = [('ir', 2), ('ir', 2)]
+    result = r.aggregate(dupobjects, 'in', improvers, ranker_names=dupnames, weights=weights)
+    expected = r.aggregate(dupobjects, 'in', improvers, ranker_names=uniquenames, weights=weights)
+    assert result[:2] == expected[:2]
+    assert result[2] == [dupnames[uniquenames.index(name)] for name in expected[2]]
+
+def test_aggregate_returns_removed_names():
+    objects, names = read("data10_10.csv")
+    ranker, score, removed = r.aggregate(objects, 'in', [('ir', 2), ('ir', 2)],
+                                         ranker_names=names)
+    assert score == pytest.approx(0.2111111111111111)
+    assert len(removed) > 0 and set(removed) <= set(names)
+    assert r.aggregate(objects, 'in', [('ir', 2), ('ir', 2)])[2] == removed ##default names
+
+def test_aggregate_rejects_unknown_names_before_running():
+    objects, names = read("data10_10.csv")
+    with pytest.raises(ValueError):
+        r.aggregate(objects, 'in', ['igf', 'xyz'])
+    with pytest.raises(ValueError):
+        r.aggregate(objects, 'xyz')
+
+def test_aggregate_reuses_table_for_removal(monkeypatch):
+    objects, names = read("data10_10.csv")
+    weights = [float(i % 3 + 1) for i in range(len(names))]
+    improvers = [('ir', 2), 'igf', ('ir', 2)]
+    random.seed(5)
+    expected = r.aggregate(objects, 'in', improvers, weights=weights)
+    table = r.pair_table(objects)
+
+    def no_table(objects):
+        raise AssertionError("pair_table rebuilt")
+    monkeypatch.setattr(r, 'pair_table', no_table)
+    random.seed(5)
+    result = r.aggregate(objects, 'in', improvers, weights=weights, table=table)
+    assert len(result[2]) > 0
+    assert result[2] == expected[2]
+    assert result[1] == pytest.approx(expected[1])
+
+def test_chained_removal_in_command_line(capsys):
+    from rank_aggregation import cli
+    cli.main(["aggregate.py", os.path.join(DATA, "data10_10.csv"), "in", "ir", "2", "ir", "2"])
+    out = capsys.readouterr().out
+    final = [line for line in out.splitlines() if line.startswith("Final score:")][0]
+    assert float(final.split(":")[1]) == pytest.approx(0.2111111111111111)
+
+def test_removal_needs_one_weight_per_ranker():
+    objects, names = read("data10_10.csv")
+    ranker, score = r.indegree_aggregator(objects)
+    with pytest.raises(ValueError):
+        r.remove_top_k(objects, names + ["extra"], ranker, 1)
+    with pytest.raises(ValueError):
+        r.remove_top_k(objects, names, ranker, 1, weights=[1]*(len(names)-1))
+
+@pytest.mark.parametrize("extra", [3, -1])
+def test_aggregate_needs_one_weight_per_ranker(extra):
+    objects, names = read("data10_10.csv")
+    weights = [1]*(len(names)+extra)
+    for method in ['in', 'pg', 'blk']:
+        with pytest.raises(ValueError):
+            r.aggregate(objects, method, weights=weights)
+    with pytest.raises(ValueError):
+        r.kendall_tau(objects, r.get_ranker(list(objects)), weights)
+
+def test_suspicious_rankers_skip_zero_weights():
+    objects, names = read("data20_40.csv")
+    ranker, score = r.indegree_aggregator(objects)
+    worst = r.suspicious_rankers(objects, ranker, 3)
+    weights = [1]*len(names)
+    weights[worst[0]] = 0
+    assert worst[0] not in r.suspicious_rankers(objects, ranker, 3, weights)
+
+    tau, coverage, agreement = r.ranker_analytics(objects, ranker, agreement=False)
+    weights = [float(i % 4) for i in range(len(names))]
+    average = sum([w*t for (w, t) in zip(weights, tau)])/sum(weights)
+    assert average == pytest.approx(r.kendall_tau(objects, ranker, weights))